@@ -1,9 +1,9 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
-from config import Config
-import os
+from config import Config, ProductionConfig
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,31 +13,30 @@ class Base(DeclarativeBase):
   pass
 
 
+# Extensions are module-level singletons; create_app() only binds them to an app,
+# so building an app doesn't re-create them or their event listeners
 # db = SQLAlchemy(model_class=Base)
-# db = SQLAlchemy("postgresql://thasanee@localhost:5432/stock_market")
-# db = SQLAlchemy()
+db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
 
-app = Flask(__name__)
-# app.config.from_object(config_class)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
-# print( 'what is the url', os.getenv('DATABASE_URL') )
-# app.config['SQLALCHEMY_DATABASE_URI'] = "postgresql://thasanee@localhost:5432/stock_market_db"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False # Recommended to disable for performance
-db = SQLAlchemy(app)
 
+def create_app(config_class=None):
+    if config_class is None:
+        # FLASK_ENV=production (set on Render) selects the strict config
+        config_class = ProductionConfig if os.environ.get('FLASK_ENV') == 'production' else Config
+
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+
+    # Only ProductionConfig leaves these unset
+    if not app.config.get('SECRET_KEY'):
+        raise ValueError("SECRET_KEY environment variable must be set in production")
+    if not app.config.get('SQLALCHEMY_DATABASE_URI'):
+        raise ValueError("DATABASE_URL environment variable must be set in production")
 
-def create_app(config_class=Config):
-    # app = Flask(__name__)
-    # # app.config.from_object(config_class)
-    # app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://thasanee@localhost:5432/stock_market'
-    # app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False # Recommended to disable for performance
-    # db = SQLAlchemy(app)
-    
     # Initialize extensions
-    # with app.app_context():
-    # db.init_app(app)
+    db.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
     
@@ -75,4 +74,10 @@ def create_app(config_class=Config):
     from app.chat import bp as chat_bp
     app.register_blueprint(chat_bp, url_prefix='/chat')
 
+    @app.cli.command('init-db')
+    def init_db():
+        """Initialize the database."""
+        db.create_all()
+        print("Database initialized.")
+
     return app
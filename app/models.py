@@ -26,7 +26,7 @@ class User(UserMixin, db.Model):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
 
 class Stock(db.Model):
     id = db.Column(db.Integer, primary_key=True)
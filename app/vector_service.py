@@ -3,16 +3,27 @@ Vector service for handling embeddings and semantic search.
 Uses sentence-transformers for creating embeddings and pgvector for storage.
 """
 
-from typing import List, Dict, Optional
+from collections import OrderedDict
+import importlib.util
+import threading
+from typing import List, Dict, Optional, Tuple
 from sentence_transformers import SentenceTransformer # type: ignore
 from app.models import ChatMessage, StockDocument, db
 import numpy as np # type: ignore
 
+# Int8-quantized ONNX export shipped with all-MiniLM-L6-v2 (uses VNNI on Ice Lake / Zen4)
+ONNX_MODEL_FILE = 'onnx/model_qint8_avx512_vnni.onnx'
+
 
 class VectorService:
     """Service for creating and searching vector embeddings"""
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        cache_size: int = 1024,
+        backend: str = 'torch'
+    ):
         """
         Initialize the vector service with an embedding model.
 
@@ -22,12 +33,69 @@ class VectorService:
                        Other options:
                        - 'all-mpnet-base-v2' (768 dims, better quality, slower)
                        - 'paraphrase-multilingual-MiniLM-L12-v2' (multilingual)
+            cache_size: Maximum number of texts whose embeddings are kept in memory
+                       (least recently used are evicted first). 0 disables the cache.
+            backend: 'torch' (default) or 'onnx'. The ONNX Runtime backend needs
+                     sentence-transformers>=3.2 with optimum[onnxruntime], which are
+                     not in requirements.txt (install requirements-onnx.txt); if
+                     they are missing the service falls back to torch. The backend
+                     actually in use is kept in self.backend.
         """
-        print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        print(f"Loading embedding model: {model_name} (backend: {backend})")
+        self.model, self.backend = self._load_model(model_name, backend)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         print(f"Embedding model loaded. Dimension: {self.embedding_dim}")
 
+        # Text -> embedding, so repeated texts skip the transformer forward pass
+        self.cache_size = cache_size
+        self._embedding_cache: OrderedDict = OrderedDict()
+        # The service is a process-wide singleton used by request threads
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _load_model(model_name: str, backend: str) -> Tuple[SentenceTransformer, str]:
+        """Load the model with the requested backend, falling back to torch"""
+        if backend == 'onnx':
+            # sentence-transformers runs ONNX through optimum.onnxruntime and raises
+            # a bare Exception when it's missing, so check before constructing
+            missing = [m for m in ('optimum', 'onnxruntime') if importlib.util.find_spec(m) is None]
+            if missing:
+                print(f"ONNX backend unavailable (missing {', '.join(missing)}; "
+                      f"install requirements-onnx.txt), falling back to torch")
+                return SentenceTransformer(model_name), 'torch'
+            try:
+                model = SentenceTransformer(
+                    model_name,
+                    backend='onnx',
+                    model_kwargs={'file_name': ONNX_MODEL_FILE}
+                )
+                return model, 'onnx'
+            except (TypeError, ImportError, OSError) as e:
+                # TypeError: sentence-transformers<3.2 has no backend argument
+                print(f"ONNX backend unavailable ({e}), falling back to torch")
+        elif backend != 'torch':
+            raise ValueError(f"Unknown backend '{backend}', expected 'torch' or 'onnx'")
+
+        return SentenceTransformer(model_name), 'torch'
+
+    def _get_cached(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for text (marking it recently used), or None"""
+        with self._cache_lock:
+            embedding = self._embedding_cache.get(text)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(text)
+        return embedding
+
+    def _store_cached(self, text: str, embedding: np.ndarray) -> None:
+        """Add an embedding to the cache, evicting the least recently used entries"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._embedding_cache[text] = embedding
+            self._embedding_cache.move_to_end(text)
+            while len(self._embedding_cache) > self.cache_size:
+                self._embedding_cache.popitem(last=False)
+
     def create_embedding(self, text: str) -> List[float]:
         """
         Create a vector embedding for the given text.
@@ -41,13 +109,18 @@ class VectorService:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
-        # Create embedding
-        embedding = self.model.encode(text, convert_to_numpy=True)
+        # Create embedding (or reuse the cached one)
+        embedding = self._get_cached(text)
+        if embedding is None:
+            # Unit-length output: cosine similarity is a plain dot product and
+            # L2 distance is sqrt(2 - 2 * cos)
+            embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+            self._store_cached(text, embedding)
 
         # Convert to list for database storage
         return embedding.tolist()
 
-    def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def create_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """
         Create embeddings for multiple texts at once (more efficient).
 
@@ -55,15 +128,36 @@ class VectorService:
             texts: List of texts to embed
 
         Returns:
-            List of embedding vectors
+            2-D float32 array with one embedding per row (call .tolist() on a
+            row before storing it in the database)
         """
         if not texts:
-            return []
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        # Only encode texts that aren't cached yet (each distinct text once)
+        embeddings = {}
+        misses = []
+        for text in texts:
+            if text in embeddings:
+                continue
+            cached = self._get_cached(text)
+            if cached is None:
+                misses.append(text)
+                embeddings[text] = None
+            else:
+                embeddings[text] = cached
 
-        # Batch encoding is more efficient
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
+        if misses:
+            # Batch encoding is more efficient
+            encoded = self.model.encode(
+                misses, batch_size=32, convert_to_numpy=True, normalize_embeddings=True
+            )
+            for text, emb in zip(misses, encoded):
+                embeddings[text] = emb
+                self._store_cached(text, emb)
 
-        return [emb.tolist() for emb in embeddings]
+        # Merge back in the original order
+        return np.asarray([embeddings[text] for text in texts], dtype=np.float32)
 
     def search_similar_messages(
         self,
@@ -155,7 +249,7 @@ class VectorService:
         Returns:
             True if successful, False otherwise
         """
-        message = ChatMessage.query.get(message_id)
+        message = db.session.get(ChatMessage, message_id)
         if not message:
             print(f"Message {message_id} not found")
             return False
@@ -219,7 +313,7 @@ class VectorService:
                     try:
                         db.session.execute(
                             db.text("UPDATE chat_message SET embedding = :embedding WHERE id = :id"),
-                            {'embedding': embedding, 'id': msg.id}
+                            {'embedding': embedding.tolist(), 'id': msg.id}
                         )
                         stats['succeeded'] += 1
                     except Exception as e:
@@ -27,6 +27,6 @@ class ProductionConfig(Config):
     """Production configuration - uses PostgreSQL"""
     DEBUG = False
     TESTING = False
-    # Ensure SECRET_KEY is set in production
-    if not os.environ.get('SECRET_KEY'):
-        raise ValueError("SECRET_KEY environment variable must be set in production")
+    # No dev fallbacks in production; create_app() fails if either is unset
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SQLALCHEMY_DATABASE_URI = Config.database_url
@@ -0,0 +1,32 @@
+"""
+Shared pytest fixtures for the root-level test scripts.
+"""
+
+import os
+import pytest
+
+
+def _build_vector_service():
+    """Load the embedding model and run one forward pass so the first test isn't a cold start"""
+    from app.vector_service import VectorService
+
+    # EMB_BACKEND=onnx runs the suite on ONNX Runtime instead of PyTorch
+    service = VectorService(backend=os.environ.get('EMB_BACKEND', 'torch'))
+    service.create_embedding("warmup")
+    return service
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """Prewarm the shared VectorService during collection, only if a collected test uses it"""
+    if any('vector_service' in getattr(item, 'fixturenames', ()) for item in items):
+        config._vector_service = _build_vector_service()
+
+
+@pytest.fixture(scope="session")
+def vector_service(pytestconfig):
+    """One VectorService (and one loaded embedding model) for the whole test session"""
+    service = getattr(pytestconfig, '_vector_service', None)
+    if service is None:
+        service = _build_vector_service()
+        pytestconfig._vector_service = service
+    return service
@@ -8,10 +8,32 @@ This shows the complete flow of:
 4. Get smarter, context-aware response
 """
 
-from app.vector_service import get_vector_service
-from app.chat_service import get_chat_service
-from app.models import ChatMessage, db
 from typing import List, Dict
+import functools
+import string
+
+# Compiled once at import instead of rebuilt with f-strings on every request
+_PROMPT_TEMPLATE = string.Template(
+    "${context}Current question: $question\n\n"
+    "Answer based on the context above if relevant, otherwise provide a general answer."
+)
+
+ROLE_LABELS = {'user': 'User', 'assistant': 'Assistant'}
+
+# Messages made only of these words carry nothing worth retrieving
+_FILLER_WORDS = frozenset({
+    'ok', 'okay', 'yes', 'no', 'yeah', 'yep', 'nope', 'thanks', 'thank', 'you',
+    'thx', 'cool', 'great', 'sure', 'hi', 'hello', 'hey', 'bye'
+})
+
+
+@functools.lru_cache(maxsize=256)
+def _should_retrieve(message: str) -> bool:
+    """Return True if the message is long enough to be worth a vector search"""
+    words = message.lower().split()
+    if len(words) < 3:
+        return False
+    return not all(word.strip('.,!?') in _FILLER_WORDS for word in words)
 
 
 def chat_with_rag(user_message: str, session_id: str, user_context: Dict = None) -> Dict:
@@ -26,18 +48,26 @@ def chat_with_rag(user_message: str, session_id: str, user_context: Dict = None)
     Returns:
         Dictionary with response and metadata
     """
+    # Imported here so importing this module doesn't load Flask, the DB and the model
+    from app.vector_service import get_vector_service
+    from app.chat_service import get_chat_service
+    from app.models import ChatMessage, db
+
     # Initialize services
     vector_service = get_vector_service()
     chat_service = get_chat_service()
 
     # STEP 1: Search for relevant past messages (RAG)
+    # Short turns like "ok" or "yes" skip the embedding call and index scan
     print(f"\n1. Searching for relevant context...")
-    relevant_messages = vector_service.search_similar_messages(
-        query=user_message,
-        limit=3,  # Get top 3 most relevant messages
-        session_id=session_id,  # Only search this session
-        distance_threshold=1.5  # Only include if reasonably similar
-    )
+    relevant_messages = []
+    if _should_retrieve(user_message):
+        relevant_messages = vector_service.search_similar_messages(
+            query=user_message,
+            limit=3,  # Get top 3 most relevant messages
+            session_id=session_id,  # Only search this session
+            distance_threshold=1.5  # Only include if reasonably similar
+        )
 
     print(f"   Found {len(relevant_messages)} relevant messages")
     for msg in relevant_messages:
@@ -47,19 +77,17 @@ def chat_with_rag(user_message: str, session_id: str, user_context: Dict = None)
     print(f"\n2. Building context...")
     context_text = ""
     if relevant_messages:
-        context_text = "Relevant past discussion:\n"
-        for msg in relevant_messages:
-            role = "User" if msg['role'] == 'user' else "Assistant"
-            context_text += f"{role}: {msg['content']}\n"
-        context_text += "\n"
+        history = "\n".join(
+            f"{ROLE_LABELS.get(msg['role'], 'Assistant')}: {msg['content']}"
+            for msg in relevant_messages
+        )
+        context_text = f"Relevant past discussion:\n{history}\n\n"
 
     # STEP 3: Call Ollama with enhanced context
     print(f"\n3. Calling Ollama with context...")
 
     # Build full prompt with RAG context
-    enhanced_prompt = f"""{context_text}Current question: {user_message}
-
-Answer based on the context above if relevant, otherwise provide a general answer."""
+    enhanced_prompt = _PROMPT_TEMPLATE.substitute(context=context_text, question=user_message)
 
     # Call Ollama
     response = chat_service.get_response(
@@ -108,6 +136,8 @@ def chat_without_rag(user_message: str, user_context: Dict = None) -> Dict:
     """
     Original chat function without RAG (for comparison)
     """
+    from app.chat_service import get_chat_service
+
     chat_service = get_chat_service()
 
     response = chat_service.get_response(
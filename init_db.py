@@ -37,8 +37,8 @@ def init_database():
         )
         user2.set_password('password123')
         
-        db.session.add(user1)
-        db.session.add(user2)
+        users = [user1, user2]
+        db.session.add_all(users)
         
         # Create sample stocks
         stocks_data = [
@@ -68,9 +68,10 @@ def init_database():
         # Commit all changes
         db.session.commit()
         print("✅ Sample data created successfully!")
-        print(f"   - Users: {User.query.count()}")
-        print(f"   - Stocks: {Stock.query.count()}")
-        print(f"   - Trades: {Trade.query.count()}")
+        # Counts are already known from the inserted data; no need to query them back
+        print(f"   - Users: {len(users)}")
+        print(f"   - Stocks: {len(stocks_data)}")
+        print(f"   - Trades: {len(trades_data)}")
 
 if __name__ == '__main__':
     init_database()
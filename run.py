@@ -1,14 +1,10 @@
+import os
 from app import create_app, db
 from flask_migrate import upgrade
+from sqlalchemy import select, insert
 
 app = create_app()
 
-@app.cli.command()
-def init_db():
-    """Initialize the database."""
-    db.create_all()
-    print("Database initialized.")
-
 @app.cli.command()
 def populate_sample_data():
     """Populate database with sample data."""
@@ -42,42 +38,51 @@ def populate_sample_data():
         {'ticker': 'AMZN', 'name': 'Amazon.com Inc.', 'sector': 'Consumer Discretionary', 'price': 155.20, 'shares_outstanding': 10400000000}
     ]
     
-    for stock_data in stocks_data:
-        if not Stock.query.filter_by(ticker=stock_data['ticker']).first():
-            stock = Stock(**stock_data)
-            db.session.add(stock)
+    # One IN-query for the tickers that already exist instead of a SELECT per stock
+    existing_tickers = set(db.session.scalars(
+        select(Stock.ticker).where(Stock.ticker.in_([s['ticker'] for s in stocks_data]))
+    ))
+    new_stocks = [s for s in stocks_data if s['ticker'] not in existing_tickers]
+    if new_stocks:
+        db.session.execute(insert(Stock), new_stocks)
     
-    db.session.commit()
+    # Flush (not commit) so users and stocks get ids; one commit at the end covers everything
+    db.session.flush()
     
     # Create sample trades
     users = User.query.all()
     stocks = Stock.query.all()
+    rng = random.Random(42)  # Local, seeded generator keeps the fixture reproducible
     
-    for user in users:
-        for _ in range(5):  # 5 trades per user
-            stock = random.choice(stocks)
-            side = random.choice(['buy', 'sell'])
-            quantity = random.randint(1, 100)
-            price = stock.price + random.uniform(-10, 10)  # Price variation
-            timestamp = datetime.utcnow() - timedelta(days=random.randint(1, 30))
+    with db.session.no_autoflush:
+        for user in users:
+            for _ in range(5):  # 5 trades per user
+                stock = rng.choice(stocks)
+                side = rng.choice(['buy', 'sell'])
+                quantity = rng.randint(1, 100)
+                price = float(stock.price) + rng.uniform(-10, 10)  # Price variation (Numeric column -> Decimal)
+                timestamp = datetime.utcnow() - timedelta(days=rng.randint(1, 30))
             
-            trade = Trade(
-                user_id=user.id,
-                stock_id=stock.id,
-                side=side,
-                quantity=quantity,
-                price=price,
-                timestamp=timestamp
-            )
-            db.session.add(trade)
+                trade = Trade(
+                    user_id=user.id,
+                    stock_id=stock.id,
+                    side=side,
+                    quantity=quantity,
+                    price=price,
+                    timestamp=timestamp
+                )
+                db.session.add(trade)
     
     db.session.commit()
     print("Sample data populated successfully.")
 
 if __name__ == '__main__':
     app.secret_key = "super secret key" # Needed for session management # https://stackoverflow.com/questions/26080872/secret-key-not-set-in-flask-session-using-the-flask-session-extension/26080974#26080974
-    with app.app_context():
-        db.create_all()
+    # Schema creation reflects every table, so only do it on request;
+    # otherwise rely on `flask db upgrade` / `flask init-db`
+    if os.environ.get('FLASK_INIT_DB'):
+        with app.app_context():
+            db.create_all()
     app.run(debug=True, port=5001)
 
 
@@ -8,7 +8,9 @@ from app import create_app, db
 from app.models import User, Stock, Trade
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
-import random
+import csv
+import io
+import numpy as np
 
 def create_sample_users():
     """Create sample users."""
@@ -121,67 +123,107 @@ def create_sample_stocks():
     db.session.commit()
     return created_stocks
 
-def create_sample_trades(users, stocks):
-    """Create sample trades."""
-    created_trades = []
-    
-    for user in users:
-        # Each user gets 8-15 trades
-        num_trades = random.randint(8, 15)
-        
-        for _ in range(num_trades):
-            stock = random.choice(stocks)
-            side = random.choice(['buy', 'sell'])
-            
+def create_sample_trades(users, stocks, seed=42):
+    """Create sample trades (deterministic for a given seed)."""
+    if not users or not stocks:
+        print("Created 0 trades")
+        return []
+
+    rng = np.random.default_rng(seed)
+
+    # Each user gets 8-15 trades; draw every random parameter in one batch
+    trades_per_user = rng.integers(8, 16, size=len(users))
+    num_trades = int(trades_per_user.sum())
+    user_idx = np.repeat(np.arange(len(users)), trades_per_user)
+    stock_idx = rng.integers(0, len(stocks), size=num_trades)
+    wants_sell = rng.random(num_trades) < 0.5
+    buy_quantities = rng.integers(1, 201, size=num_trades)
+    sell_fractions = rng.random(num_trades)
+    # Price variation: current price ± 5%
+    price_variations = rng.uniform(-0.05, 0.05, size=num_trades)
+    # Random timestamp within the last 90 days
+    days_ago = rng.integers(1, 91, size=num_trades)
+
+    # Nothing is pending while the trades are built, so skip autoflush checks
+    with db.session.no_autoflush:
+        # Running share balance per (user, stock) so sells never exceed holdings
+        holdings = {}
+        user_ids = [user.id for user in users]
+        for trade in Trade.query.filter(Trade.user_id.in_(user_ids)).all():
+            key = (trade.user_id, trade.stock_id)
+            delta = trade.quantity if trade.side == 'buy' else -trade.quantity
+            holdings[key] = holdings.get(key, 0) + delta
+
+        now = datetime.utcnow()
+        trades_list = []
+        for u, s, sell, buy_qty, sell_frac, variation, days in zip(
+            user_idx, stock_idx, wants_sell, buy_quantities,
+            sell_fractions, price_variations, days_ago
+        ):
+            user = users[u]
+            stock = stocks[s]
+            key = (user.id, stock.id)
+            user_shares = holdings.get(key, 0)
+
             # For sell trades, make sure user has some shares first
-            if side == 'sell':
-                # Check if user has any shares of this stock
-                user_shares = 0
-                user_trades = Trade.query.filter_by(user_id=user.id, stock_id=stock.id).all()
-                for trade in user_trades:
-                    if trade.side == 'buy':
-                        user_shares += trade.quantity
-                    else:
-                        user_shares -= trade.quantity
-                
-                if user_shares <= 0:
-                    side = 'buy'  # Change to buy if no shares
-            
-            # Generate realistic trade parameters
-            if side == 'buy':
-                quantity = random.randint(1, 200)
+            if sell and user_shares > 0:
+                side = 'sell'
+                # Don't sell more than user owns
+                quantity = 1 + int(sell_frac * min(user_shares, 200))
+                holdings[key] = user_shares - quantity
             else:
-                # For sell trades, don't sell more than user owns
-                user_shares = 0
-                user_trades = Trade.query.filter_by(user_id=user.id, stock_id=stock.id).all()
-                for trade in user_trades:
-                    if trade.side == 'buy':
-                        user_shares += trade.quantity
-                    else:
-                        user_shares -= trade.quantity
-                quantity = random.randint(1, min(user_shares, 200))
-            
-            # Price variation: current price ± 5%
-            price_variation = random.uniform(-0.05, 0.05)
-            price = float(stock.price) * (1 + price_variation)
-            
-            # Random timestamp within the last 90 days
-            timestamp = datetime.utcnow() - timedelta(days=random.randint(1, 90))
-            
-            trade = Trade(
-                user_id=user.id,
-                stock_id=stock.id,
-                side=side,
-                quantity=quantity,
-                price=price,
-                timestamp=timestamp
-            )
-            db.session.add(trade)
-            created_trades.append(trade)
-    
-    db.session.commit()
-    print(f"Created {len(created_trades)} trades")
-    return created_trades
+                side = 'buy'
+                quantity = int(buy_qty)
+                holdings[key] = user_shares + quantity
+
+            trades_list.append({
+                'user_id': user.id,
+                'stock_id': stock.id,
+                'side': side,
+                'quantity': quantity,
+                'price': float(stock.price) * (1 + float(variation)),
+                'timestamp': now - timedelta(days=int(days))
+            })
+
+    insert_trades(trades_list)
+    print(f"Created {len(trades_list)} trades")
+    return trades_list
+
+def insert_trades(trades_list):
+    """Bulk-load trades: COPY on PostgreSQL, executemany INSERT elsewhere."""
+    if not trades_list:
+        return
+
+    if db.engine.dialect.name != 'postgresql':
+        db.session.bulk_insert_mappings(Trade, trades_list)
+        db.session.commit()
+        return
+
+    columns = ['user_id', 'stock_id', 'side', 'quantity', 'price', 'timestamp']
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for trade in trades_list:
+        writer.writerow([
+            trade['user_id'],
+            trade['stock_id'],
+            trade['side'],
+            trade['quantity'],
+            f"{trade['price']:.2f}",
+            trade['timestamp'].isoformat()
+        ])
+    buffer.seek(0)
+
+    raw_conn = db.engine.raw_connection()
+    try:
+        cur = raw_conn.cursor()
+        cur.copy_expert(
+            f"COPY {Trade.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cur.close()
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
 
 def main():
     """Main function to populate sample data."""
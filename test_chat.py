@@ -5,7 +5,6 @@ Run this to verify your chat service is working correctly.
 """
 
 import os
-from app.chat_service import get_chat_service
 
 def test_chat_service():
     """Test the chat service with various scenarios"""
@@ -14,6 +13,8 @@ def test_chat_service():
     print("CHAT SERVICE TEST")
     print("=" * 60)
 
+    from app.chat_service import get_chat_service
+
     # Initialize service
     chat_service = get_chat_service()
 
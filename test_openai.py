@@ -3,14 +3,15 @@
 Test script to verify OpenAI API connection
 """
 
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def test_openai_connection():
-    """Test if OpenAI API key is valid and working"""
+async def check_openai_connection():
+    """Check if OpenAI API key is valid and working"""
 
     print("=" * 60)
     print("OpenAI API Connection Test")
@@ -35,7 +36,7 @@ def test_openai_connection():
 
     # Try to import OpenAI
     try:
-        from openai import OpenAI
+        from openai import AsyncOpenAI
         print("✅ OpenAI library imported successfully")
     except ImportError as e:
         print(f"❌ Failed to import OpenAI library: {e}")
@@ -44,7 +45,7 @@ def test_openai_connection():
 
     # Try to create client
     try:
-        client = OpenAI(api_key=api_key)
+        client = AsyncOpenAI(api_key=api_key)
         print("✅ OpenAI client created successfully")
     except Exception as e:
         print(f"❌ Failed to create OpenAI client: {e}")
@@ -53,7 +54,7 @@ def test_openai_connection():
     # Try to make a simple API call
     print("\n🔄 Testing API call...")
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
@@ -83,6 +84,10 @@ def test_openai_connection():
         print("\nCheck your OpenAI dashboard: https://platform.openai.com/account/usage")
         return False
 
+def test_openai_connection():
+    """Test if OpenAI API key is valid and working (sync wrapper so pytest runs it)"""
+    return asyncio.run(check_openai_connection())
+
 if __name__ == '__main__':
     print("\n")
     success = test_openai_connection()
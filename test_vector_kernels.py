@@ -0,0 +1,127 @@
+"""
+Tests for vector_kernels.py: quantization, distance kernels, top-k selection,
+the semantic cache and the on-disk embedding cache. No model needed.
+"""
+
+import numpy as np
+import pytest
+import vector_kernels
+from vector_kernels import (
+    KnowledgeBaseIndex,
+    PRECISIONS,
+    cached_embeddings,
+    l2_distances,
+    quantize_int8,
+    select_top_k,
+    squared_norms,
+)
+
+
+def _unit_rows(n, dim=384, seed=0):
+    """Fixed random unit-length rows, like normalised MiniLM embeddings"""
+    rows = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _query_near(kb, weights):
+    """Unit query mixing the first rows of kb, closest to row 0, then row 1, ..."""
+    query = sum(w * kb[i] for i, w in enumerate(weights))
+    return (query / np.linalg.norm(query)).astype(np.float32)
+
+
+def test_quantize_int8_round_trip():
+    """Dequantized codes stay within half a step of the original values"""
+    kb = _unit_rows(10)
+    codes, scale = quantize_int8(kb)
+
+    assert codes.dtype == np.int8
+    assert scale.shape == (kb.shape[1],)
+    assert np.all(np.abs(codes.astype(np.float32) * scale - kb) <= scale / 2 + 1e-6)
+
+
+def test_l2_distances_matches_direct():
+    """l2_distances (Numba or the NumPy identity) matches ||kb - q||"""
+    kb = _unit_rows(20)
+    query = _unit_rows(1, seed=1)[0]
+    expected = np.linalg.norm(kb - query, axis=1)
+
+    np.testing.assert_allclose(l2_distances(kb, query), expected, atol=1e-5)
+    np.testing.assert_allclose(l2_distances(kb, query, squared_norms(kb)), expected, atol=1e-5)
+
+
+def test_numba_kernel_matches_identity():
+    """The JIT kernel agrees with the NumPy L2 identity"""
+    pytest.importorskip('numba')
+    kb = _unit_rows(20)
+    query = _unit_rows(1, seed=1)[0]
+
+    identity = np.sqrt(np.maximum(squared_norms(kb) + query @ query - 2.0 * (kb @ query), 0.0))
+    np.testing.assert_allclose(vector_kernels._l2_distances_jit(kb, query), identity, atol=1e-5)
+
+
+def test_select_top_k_matches_argsort():
+    """select_top_k returns the same indices, in order, as a full argsort"""
+    dists = np.random.default_rng(2).random(50)
+
+    for k in (1, 3, 10, 50):
+        np.testing.assert_array_equal(select_top_k(dists, k), np.argsort(dists)[:k])
+    # k larger than the array is clamped
+    np.testing.assert_array_equal(select_top_k(dists[:4], 10), np.argsort(dists[:4]))
+
+
+def test_top_k_same_order_for_every_precision():
+    """int8, float16 and float32 indexes rank the same rows in the same order"""
+    kb = _unit_rows(12)
+    query = _query_near(kb, [3.0, 2.0, 1.0])
+    expected = np.linalg.norm(kb - query, axis=1)
+
+    for precision in PRECISIONS:
+        index = KnowledgeBaseIndex(kb, precision=precision)
+        top, dists = index.top_k(query, k=3)
+
+        np.testing.assert_array_equal(top, [0, 1, 2])
+        np.testing.assert_allclose(dists, expected[top], atol=1e-2)
+
+
+def test_cache_hit_rescored_for_new_query():
+    """A cache hit returns the new query's own distances to the cached rows"""
+    kb = _unit_rows(12)
+    index = KnowledgeBaseIndex(kb, precision='float32', cache_threshold=0.98)
+    query = _query_near(kb, [3.0, 2.0, 1.0])
+    index.top_k(query, k=3)
+
+    near = _query_near(kb, [3.0, 2.0, 1.1])
+    assert float(query @ near) >= 0.98
+    rows, dists = index.top_k(near, k=3)
+
+    np.testing.assert_allclose(dists, index.distances(near, rows))
+    assert np.all(np.diff(dists) >= 0)
+    assert len(index.cache) == 1  # served from the cache, not stored again
+
+
+def test_cache_disabled_by_default():
+    """The semantic cache is opt-in"""
+    assert KnowledgeBaseIndex(_unit_rows(4)).cache is None
+
+
+def test_cached_embeddings_reencodes_on_change(tmp_path):
+    """The disk cache is reused until the texts or the encoder variant change"""
+    cache_path = tmp_path / 'kb_embs.npz'
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return _unit_rows(len(texts), dim=8, seed=len(calls))
+
+    texts = ["What is a stock?", "Explain dividend yield"]
+
+    first = cached_embeddings(texts, encode, variant='torch-fp32', cache_path=cache_path)
+    again = cached_embeddings(texts, encode, variant='torch-fp32', cache_path=cache_path)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first, again)
+
+    cached_embeddings(texts, encode, variant='onnx', cache_path=cache_path)
+    assert len(calls) == 2
+
+    cached_embeddings(texts + ["What is a P/E ratio?"], encode, variant='onnx', cache_path=cache_path)
+    assert len(calls) == 3
@@ -0,0 +1,283 @@
+"""
+In-memory knowledge base scoring for the vector search demos.
+Plain NumPy (no Flask), so test_vector_standalone.py can use it too.
+"""
+
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import hashlib
+import os
+import numpy as np # type: ignore
+
+# Numba is optional: when installed, the float32 distance loop is JIT-compiled
+# (used only when the index is stored as float32, see l2_distances)
+try:
+    from numba import njit, prange # type: ignore
+except ImportError:
+    njit = None
+
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Storage precision used by the demos; override with KB_PRECISION=float32 / float16
+DEFAULT_PRECISION = os.environ.get('KB_PRECISION', 'int8')
+
+# Precomputed embeddings for the static demo knowledge base
+KB_CACHE_PATH = Path(__file__).resolve().parent / '.cache' / 'kb_embs.npz'
+
+
+def encoder_variant(backend: str = 'torch', half: bool = False) -> str:
+    """
+    Name how a model was run, for the cache key in cached_embeddings:
+    'onnx', 'torch-fp16' or 'torch-fp32'. Both demos use this so they share one cache.
+    """
+    if backend == 'onnx':
+        return 'onnx'
+    return f"{backend}-{'fp16' if half else 'fp32'}"
+
+
+def cached_embeddings(
+    texts: List[str],
+    encode: Callable[[List[str]], np.ndarray],
+    model_name: str = 'all-MiniLM-L6-v2',
+    variant: str = '',
+    cache_path: Path = KB_CACHE_PATH
+) -> np.ndarray:
+    """
+    Load embeddings for a static list of texts from disk, encoding them only
+    when the texts, the model or the encoder variant changed since the cache
+    was written.
+
+    Args:
+        texts: Texts to embed
+        encode: Function that embeds a list of texts (used on a cache miss)
+        model_name: Model that produced the embeddings, part of the cache key
+        variant: How the model was run, from encoder_variant(); part of the
+                 cache key so runs with different encoders don't share embeddings
+        cache_path: Where the .npz cache lives
+
+    Returns:
+        (len(texts), dim) float32 array
+    """
+    key = hashlib.sha256('\n'.join([model_name, variant, *texts]).encode('utf-8')).hexdigest()
+
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            if str(cached['key']) == key:
+                return cached['embeddings']
+
+    embeddings = np.asarray(encode(texts), dtype=np.float32)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache_path, key=key, embeddings=embeddings)
+    return embeddings
+
+
+def quantize_int8(
+    embeddings: np.ndarray,
+    calibration_embeddings: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric int8 quantization with one scale per dimension.
+
+    Args:
+        embeddings: (N, dim) float matrix to quantize
+        calibration_embeddings: Optional matrix used to pick the per-dimension
+                                ranges (defaults to the embeddings themselves)
+
+    Returns:
+        Tuple of (int8 codes with shape (N, dim), float32 scales with shape (dim,))
+        where code = round(x / scale) and scale = max|x| / 127
+    """
+    calibration = embeddings if calibration_embeddings is None else calibration_embeddings
+    scale = np.abs(calibration).max(axis=0).astype(np.float32) / 127.0
+    scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(embeddings / scale), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _l2_distances_jit(kb, query):
+        out = np.empty(kb.shape[0], dtype=np.float32)
+        for i in prange(kb.shape[0]):
+            s = 0.0
+            for j in range(kb.shape[1]):
+                d = kb[i, j] - query[j]
+                s += d * d
+            out[i] = np.sqrt(s)
+        return out
+
+
+def squared_norms(kb: np.ndarray) -> np.ndarray:
+    """Squared L2 norm of every row"""
+    return np.einsum('ij,ij->i', kb, kb)
+
+
+def l2_distances(
+    kb: np.ndarray,
+    query: np.ndarray,
+    kb_sq_norms: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Euclidean distance from query to every row of a float32 matrix.
+    Uses the Numba kernel when available (first call compiles and caches it).
+    Only float32 indexes (KB_PRECISION=float32) reach this function; the
+    int8 and float16 paths in KnowledgeBaseIndex do their own NumPy scoring.
+
+    Without Numba it uses ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, so the only
+    work per call is one matrix-vector product and no (K, dim) temporary.
+    Pass precomputed kb_sq_norms when the matrix is reused across queries;
+    the Numba kernel subtracts directly and ignores them.
+    """
+    kb = np.ascontiguousarray(kb, dtype=np.float32)
+    query = np.ascontiguousarray(query, dtype=np.float32)
+
+    if njit is not None:
+        return _l2_distances_jit(kb, query)
+
+    if kb_sq_norms is None:
+        kb_sq_norms = squared_norms(kb)
+    dist2 = kb_sq_norms + query @ query - 2.0 * (kb @ query)
+    return np.sqrt(np.maximum(dist2, 0.0))
+
+
+def select_top_k(dists: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k smallest distances, smallest first, without a full sort"""
+    k = min(k, len(dists))
+    top = np.argpartition(dists, k - 1)[:k]
+    return top[np.argsort(dists[top])]
+
+
+class SemanticCache:
+    """
+    Remember search results by query embedding, so a query that is nearly
+    identical to a previous one (cosine >= threshold) reuses its result.
+    """
+
+    def __init__(self, threshold: float = 0.98, max_entries: int = 128):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.keys: Optional[np.ndarray] = None  # (M, dim) float32, unit length
+        self.values: list = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, query: np.ndarray):
+        """Return the cached result for the closest past query, or None"""
+        if self.keys is None:
+            return None
+        sims = self.keys @ query
+        best = int(np.argmax(sims))
+        if sims[best] >= self.threshold:
+            return self.values[best]
+        return None
+
+    def put(self, query: np.ndarray, value) -> None:
+        """Store a result, dropping the oldest entry when full"""
+        row = np.asarray(query, dtype=np.float32)[None, :]
+        self.keys = row if self.keys is None else np.vstack([self.keys, row])
+        self.values.append(value)
+        if len(self.values) > self.max_entries:
+            self.keys = self.keys[1:]
+            self.values.pop(0)
+
+
+class KnowledgeBaseIndex:
+    """Brute-force L2 search over a small, static set of unit-length embeddings"""
+
+    def __init__(
+        self,
+        embeddings,
+        precision: str = DEFAULT_PRECISION,
+        cache_threshold: Optional[float] = None
+    ):
+        """
+        Build the index.
+
+        Args:
+            embeddings: (K, dim) embeddings, as returned by model.encode
+            precision: Storage precision, one of PRECISIONS.
+                       'float16' halves the bytes per dimension and upcasts
+                       only for the matrix-vector product.
+                       'int8' stores 1 byte per dimension (4x smaller than float32)
+                       and scores queries asymmetrically in float32.
+            cache_threshold: Cosine similarity above which a query reuses the
+                             top-k rows of an earlier query; their distances
+                             are recomputed for the new query, but the rows may
+                             not be the new query's true top k. None (default)
+                             disables it; e.g. 0.98 opts in.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+
+        self.precision = precision
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+
+        if precision == 'int8':
+            self.codes, self.scale = quantize_int8(matrix)
+            self.matrix = None
+            # Norms of the dequantized rows, for the L2 identity at query time
+            self.sq_norms = squared_norms(self.codes.astype(np.float32) * self.scale)
+        elif precision == 'float16':
+            self.matrix = matrix.astype(np.float16)
+            self.sq_norms = squared_norms(self.matrix.astype(np.float32))
+        else:
+            self.matrix = matrix
+            self.sq_norms = squared_norms(matrix)
+
+        self.cache = SemanticCache(cache_threshold) if cache_threshold is not None else None
+
+    def __len__(self) -> int:
+        return len(self.codes if self.matrix is None else self.matrix)
+
+    def distances(self, query, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Euclidean distance (same as pgvector <->) from query to every row,
+        or only to the given row indices.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        sq_norms = self.sq_norms if rows is None else self.sq_norms[rows]
+
+        if self.precision == 'int8':
+            codes = self.codes if rows is None else self.codes[rows]
+            # Fold the per-dimension scale into the float32 query so the codes
+            # never need dequantizing: q . (c * s) == (q * s) . c
+            dots = codes.astype(np.float32) @ (query * self.scale)
+            dist2 = sq_norms + query @ query - 2.0 * dots
+            return np.sqrt(np.maximum(dist2, 0.0))
+
+        matrix = self.matrix if rows is None else self.matrix[rows]
+
+        if self.precision == 'float16':
+            dots = matrix.astype(np.float32) @ query
+            dist2 = sq_norms + query @ query - 2.0 * dots
+            return np.sqrt(np.maximum(dist2, 0.0))
+
+        return l2_distances(matrix, query, sq_norms)
+
+    def top_k(self, query, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k rows closest to the query.
+
+        Returns:
+            Tuple of (row indices, distances), most similar first
+        """
+        query = np.asarray(query, dtype=np.float32)
+
+        if self.cache is not None:
+            cached = self.cache.get(query)
+            if cached is not None and len(cached) >= min(k, len(self)):
+                # Reuse the neighbours of the similar query, but score them
+                # against this one so the distances (and order) are its own
+                rows = cached[:k]
+                dists = self.distances(query, rows)
+                order = np.argsort(dists)
+                return rows[order], dists[order]
+
+        dists = self.distances(query)
+        top = select_top_k(dists, k)
+
+        if self.cache is not None:
+            self.cache.put(query, top)
+        return top, dists[top]
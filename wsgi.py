@@ -9,11 +9,54 @@ from app import create_app, db
 # Create Flask app instance
 app = create_app()
 
-# Initialize database tables
-with app.app_context():
-    db.create_all()
+
+# Workers don't reflect the schema on import; the Render build step runs
+# init_db.py, and `python wsgi.py` creates tables once below before forking.
+# FLASK_INIT_DB=1 restores the old create-on-boot behaviour.
+if os.environ.get('FLASK_INIT_DB'):
+    with app.app_context():
+        db.create_all()
+        # Don't leave a pooled connection behind for forked workers to share
+        db.engine.dispose()
 
 if __name__ == "__main__":
     # For production, use environment variables
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+
+    # Procfile starts the app this way with no separate build step, so create
+    # missing tables here, once, in the master process
+    with app.app_context():
+        db.create_all()
+        # Drop the pooled connection before gunicorn forks; workers sharing
+        # one PostgreSQL socket corrupt each other's protocol stream
+        db.engine.dispose()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn doesn't run on Windows; fall back to the single-threaded dev server
+        app.run(host='0.0.0.0', port=port, debug=False)
+    else:
+        class StandaloneApplication(BaseApplication):
+            """Run the app under gunicorn, same as `gunicorn -w N wsgi:app`"""
+
+            def __init__(self, application, options=None):
+                self.options = options or {}
+                self.application = application
+                super().__init__()
+
+            def load_config(self):
+                for key, value in self.options.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return self.application
+
+        # WEB_CONCURRENCY is gunicorn's usual override for the worker count.
+        # Keep the default small: os.cpu_count() sees the host, not the
+        # container's CPU quota, and each worker loads its own embedding model
+        workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+        StandaloneApplication(app, {
+            'bind': f'0.0.0.0:{port}',
+            'workers': workers,
+        }).run()